@@ -0,0 +1,266 @@
+# fault_injection.py - SCRIPTABLE FAULTS FOR THE LOAD TESTING API
+"""
+Fault injection engine
+======================
+Configured at runtime through /api/admin/faults. Each rule targets one
+endpoint (or "*" for all of them) and injects one kind of fault:
+
+- error      -> respond immediately with `status` and `body`
+- latency    -> sleep a random time in `latency_ms` = [min, max] first
+- slow_drip  -> stream the real response `drip_bytes` at a time,
+                sleeping `drip_interval_ms` between chunks
+- reset      -> abort the TCP connection without a response
+
+Every rule fires with probability `rate`. Schedules are relative to the
+moment the rules were loaded:
+
+- start_after_s  -> rule is dormant until then
+- duration_s     -> rule switches off after this long (omit = forever)
+- rate_to/ramp_s -> rate moves linearly from `rate` to `rate_to`
+                    over `ramp_s` seconds, then holds
+
+Examples:
+  ramp checkout errors 0 -> 30% over 5 minutes
+    {"endpoint": "/api/checkout", "kind": "error", "rate": 0, "rate_to": 0.3, "ramp_s": 300}
+  brownout search for 60 s
+    {"endpoint": "/api/search", "kind": "latency", "rate": 1, "latency_ms": [500, 2000], "duration_s": 60}
+    {"endpoint": "/api/search", "kind": "error", "rate": 0.2, "status": 503, "duration_s": 60}
+
+Besides routes, a rule can target a named fault point that the app checks
+in the middle of a handler. "payment" is checked by checkout after auth,
+cart and stock validation, right before the order is created. Only
+error and latency faults apply there. "*" matches routes only.
+
+All dice are rolled from one random.Random, so a given seed and request
+sequence always produce the same faults.
+"""
+
+import random
+import socket
+import struct
+import threading
+import time
+
+FAULT_KINDS = ("error", "latency", "slow_drip", "reset")
+
+# Named fault points checked inside handlers, see decide_point()
+FAULT_POINTS = ("payment",)
+
+# Admin endpoints are never faulted, otherwise "*" rules could lock you out
+EXEMPT_PREFIXES = ("/api/admin/",)
+
+# Same behavior the API always had: 5% of valid checkouts fail at payment
+DEFAULT_RULES = [
+    {
+        "endpoint": "payment",
+        "kind": "error",
+        "rate": 0.05,
+        "status": 500,
+        "body": {"error": "Payment failed"}
+    }
+]
+
+
+def _number(rule, key, default=None, minimum=0.0, maximum=None):
+    value = rule.get(key)
+    if value is None:
+        # Explicit null means "use the default", same as leaving the key out
+        if default is None:
+            return None
+        value = default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"'{key}' must be a number")
+    if value < minimum or (maximum is not None and value > maximum):
+        upper = f" and {maximum}" if maximum is not None else ""
+        raise ValueError(f"'{key}' must be between {minimum}{upper}")
+    return float(value)
+
+
+def validate_rule(rule):
+    """Check a rule dict and return a normalized copy. Raises ValueError."""
+    if not isinstance(rule, dict):
+        raise ValueError("Each rule must be an object")
+    endpoint = rule.get("endpoint")
+    if not isinstance(endpoint, str) or not (
+            endpoint == "*" or endpoint.startswith("/") or endpoint in FAULT_POINTS):
+        raise ValueError(
+            "'endpoint' must be a route like /api/checkout, *, "
+            f"or a fault point ({', '.join(FAULT_POINTS)})"
+        )
+    kind = rule.get("kind")
+    if kind not in FAULT_KINDS:
+        raise ValueError(f"'kind' must be one of {', '.join(FAULT_KINDS)}")
+    if endpoint in FAULT_POINTS and kind not in ("error", "latency"):
+        raise ValueError("Fault points only support 'error' and 'latency' faults")
+
+    methods = rule.get("methods")
+    if methods is not None:
+        if not isinstance(methods, list) or not all(isinstance(m, str) for m in methods):
+            raise ValueError("'methods' must be a list of HTTP methods")
+        methods = [m.upper() for m in methods]
+
+    normalized = {
+        "endpoint": endpoint,
+        "methods": methods,
+        "kind": kind,
+        "rate": _number(rule, "rate", 1.0, maximum=1.0),
+        "rate_to": _number(rule, "rate_to", maximum=1.0),
+        "ramp_s": _number(rule, "ramp_s"),
+        "start_after_s": _number(rule, "start_after_s", 0.0),
+        "duration_s": _number(rule, "duration_s"),
+    }
+    if (normalized["rate_to"] is None) != (normalized["ramp_s"] is None):
+        raise ValueError("'rate_to' and 'ramp_s' must be given together")
+
+    if kind == "error":
+        status = rule.get("status", 503)
+        if isinstance(status, bool) or not isinstance(status, int) or not 400 <= status <= 599:
+            raise ValueError("'status' must be an HTTP error code (400-599)")
+        normalized["status"] = status
+        normalized["body"] = rule.get("body", {"error": "Injected fault"})
+    elif kind == "latency":
+        latency = rule.get("latency_ms")
+        if (not isinstance(latency, list) or len(latency) != 2
+                or not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in latency)
+                or not 0 <= latency[0] <= latency[1]):
+            raise ValueError("'latency_ms' must be [min, max] with 0 <= min <= max")
+        normalized["latency_ms"] = [float(latency[0]), float(latency[1])]
+    elif kind == "slow_drip":
+        normalized["drip_bytes"] = int(_number(rule, "drip_bytes", 64, minimum=1))
+        normalized["drip_interval_ms"] = _number(rule, "drip_interval_ms", 200)
+    return normalized
+
+
+class FaultDecision:
+    """What to do with one request, after all matching rules rolled."""
+
+    def __init__(self):
+        self.latency_s = 0.0
+        self.error = None
+        self.reset = False
+        self.drip = None
+
+    @property
+    def any(self):
+        return bool(self.latency_s or self.error or self.reset or self.drip)
+
+
+class FaultEngine:
+    """Holds the active rules, their schedule clock and the seeded RNG."""
+
+    def __init__(self, rules=None, seed=None):
+        self.lock = threading.Lock()
+        self.configure(rules or [], seed)
+
+    def configure(self, rules, seed=None):
+        """Replace all rules and restart the schedule clock. Raises ValueError."""
+        if not isinstance(rules, list):
+            raise ValueError("'rules' must be a list")
+        normalized = [validate_rule(rule) for rule in rules]
+        if seed is not None and (isinstance(seed, bool) or not isinstance(seed, int)):
+            raise ValueError("'seed' must be an integer")
+        with self.lock:
+            self.rules = normalized
+            self.seed = seed
+            self.rng = random.Random(seed)
+            self.started = time.monotonic()
+            self.injected = [0] * len(normalized)
+
+    def clear(self):
+        self.configure([], self.seed)
+
+    def current_rate(self, rule, elapsed):
+        """Rate of a rule `elapsed` seconds after configure, or None if inactive."""
+        local = elapsed - rule["start_after_s"]
+        if local < 0:
+            return None
+        if rule["duration_s"] is not None and local >= rule["duration_s"]:
+            return None
+        if rule["ramp_s"] is None:
+            return rule["rate"]
+        progress = min(local / rule["ramp_s"], 1.0) if rule["ramp_s"] > 0 else 1.0
+        return rule["rate"] + (rule["rate_to"] - rule["rate"]) * progress
+
+    def decide(self, route, path, method):
+        """Roll every rule that matches this request and combine the results."""
+        if path.startswith(EXEMPT_PREFIXES):
+            return FaultDecision()
+        return self._roll(("*", route, path), method)
+
+    def decide_point(self, point, method):
+        """Roll the rules for a named fault point inside a handler."""
+        return self._roll((point,), method)
+
+    def _roll(self, targets, method):
+        decision = FaultDecision()
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            for i, rule in enumerate(self.rules):
+                if rule["endpoint"] not in targets:
+                    continue
+                if rule["methods"] and method not in rule["methods"]:
+                    continue
+                rate = self.current_rate(rule, elapsed)
+                if not rate or self.rng.random() >= rate:
+                    continue
+
+                kind = rule["kind"]
+                if kind == "latency":
+                    low, high = rule["latency_ms"]
+                    decision.latency_s += self.rng.uniform(low, high) / 1000
+                elif kind == "error":
+                    if decision.error or decision.reset:
+                        continue
+                    decision.error = (rule["status"], rule["body"])
+                elif kind == "reset":
+                    if decision.error or decision.reset:
+                        continue
+                    decision.reset = True
+                elif kind == "slow_drip":
+                    if decision.drip:
+                        continue
+                    decision.drip = (rule["drip_bytes"], rule["drip_interval_ms"] / 1000)
+                self.injected[i] += 1
+        return decision
+
+    def snapshot(self):
+        with self.lock:
+            elapsed = time.monotonic() - self.started
+            return {
+                "seed": self.seed,
+                "elapsed_s": round(elapsed, 3),
+                "rules": [
+                    dict(rule,
+                         current_rate=self.current_rate(rule, elapsed),
+                         injected=self.injected[i])
+                    for i, rule in enumerate(self.rules)
+                ]
+            }
+
+
+def drip(data, chunk_bytes, interval_s):
+    """Yield a response body a few bytes at a time."""
+    for start in range(0, len(data), chunk_bytes):
+        if start:
+            time.sleep(interval_s)
+        yield data[start:start + chunk_bytes]
+
+
+def reset_connection(environ):
+    """
+    Kill the client connection. Returns False if the server hides the socket.
+
+    The socket is shut down rather than closed: the Werkzeug dev server
+    holds a makefile() reference that would defer a close(), and gunicorn
+    would log an error writing to a closed fd. With SO_LINGER at zero the
+    server's own close then sends an RST instead of a clean FIN.
+    """
+    sock = environ.get("gunicorn.socket") or environ.get("werkzeug.socket")
+    if sock is None:
+        return False
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+        sock.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        return False
+    return True
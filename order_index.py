@@ -0,0 +1,80 @@
+# order_index.py - FAST ORDER LOOKUPS FOR /api/orders
+"""
+Order index
+===========
+Keeps every order in two append-only, time-ordered lists:
+
+- all orders          -> time-range queries over everyone
+- one list per user   -> "view my orders" without scanning the rest
+
+Both lists are sorted by creation time, so since/until become two
+bisects. Pages go newest first, and a cursor is just a position in the
+list. Positions never move while orders are only appended, so a cursor
+stays valid as new orders arrive. clear() is called by the reset
+endpoint.
+"""
+
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+class _Timeline:
+    """Orders and their creation times, both in time order."""
+
+    def __init__(self):
+        self.orders = []
+        self.times = []
+
+    def append(self, order, created_at):
+        self.orders.append(order)
+        self.times.append(created_at)
+
+    def page(self, since, until, cursor, limit):
+        lo = bisect_left(self.times, since) if since is not None else 0
+        hi = bisect_right(self.times, until) if until is not None else len(self.times)
+        total = max(hi - lo, 0)
+        if cursor is not None:
+            hi = min(hi, cursor)
+        start = max(lo, hi - limit)
+        orders = self.orders[start:hi][::-1] if hi > start else []
+        next_cursor = start if start > lo else None
+        return orders, next_cursor, total
+
+
+class OrderIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.timeline = _Timeline()
+            self.by_user = {}
+            self.last_created_at = 0.0
+
+    def add(self, order, created_at):
+        """Stamp the order's "timestamp" and index it. Returns the time used."""
+        with self.lock:
+            # Never go backwards, even if the wall clock does
+            created_at = max(created_at, self.last_created_at)
+            self.last_created_at = created_at
+            # Set before publishing, /api/orders readers only hold this lock
+            order["timestamp"] = datetime.fromtimestamp(created_at).isoformat()
+            self.timeline.append(order, created_at)
+            user_timeline = self.by_user.get(order["username"])
+            if user_timeline is None:
+                user_timeline = self.by_user[order["username"]] = _Timeline()
+            user_timeline.append(order, created_at)
+        return created_at
+
+    def query(self, username=None, since=None, until=None, cursor=None, limit=20):
+        """
+        Newest-first page of orders, optionally for one user and/or a time window.
+        Returns (orders, next_cursor, total_matching).
+        """
+        with self.lock:
+            timeline = self.timeline if username is None else self.by_user.get(username)
+            if timeline is None:
+                return [], None, 0
+            return timeline.page(since, until, cursor, limit)
@@ -8,9 +8,11 @@ E-Commerce Load Testing API with RESET button!
 - Perfect for demos and presentations!
 
 🔄 Reset endpoint: /api/admin/reset (POST)
+💥 Fault injection: /api/admin/faults (GET / PUT / DELETE)
+⏺ Traffic recording: /api/admin/recording (GET / POST / DELETE)
 """
 
-from flask import Flask, jsonify, request, render_template_string
+from flask import Flask, Response, g, jsonify, request, render_template_string, send_from_directory
 from flask_cors import CORS
 import os
 import random
@@ -18,6 +20,10 @@ from datetime import datetime
 import threading
 import time
 
+from fault_injection import DEFAULT_RULES, FaultEngine, drip, reset_connection
+from order_index import OrderIndex
+from traffic_recorder import RECORDINGS_DIR, TrafficRecorder, recording_path
+
 app = Flask(__name__)
 CORS(app)
 
@@ -29,8 +35,19 @@ users_db = {}
 products_db = {}
 carts_db = {}
 orders_db = []
+order_index = OrderIndex()
+orders_lock = threading.Lock()
 out_of_stock_attempts = 0
 
+# Faults (5% payment failures on valid checkouts unless reconfigured)
+fault_seed = int(os.environ["FAULT_SEED"]) if os.environ.get("FAULT_SEED") else None
+fault_engine = FaultEngine(DEFAULT_RULES, fault_seed)
+
+# Traffic recording (off unless TRAFFIC_LOG names a file in RECORDINGS_DIR)
+traffic_recorder = TrafficRecorder()
+if os.environ.get("TRAFFIC_LOG"):
+    traffic_recorder.start(os.environ["TRAFFIC_LOG"])
+
 def initialize_products():
     """Initialize or RESET products to starting state, ensuring <= 30 low stock."""
     global products_db
@@ -496,7 +513,9 @@ def reset_system():
             # Clear everything else
             users_db = {}
             carts_db = {}
-            orders_db = []
+            with orders_lock:
+                orders_db = []
+                order_index.clear()
             out_of_stock_attempts = 0
         
         return jsonify({
@@ -516,6 +535,132 @@ def reset_system():
             "message": str(e)
         }), 500
 
+# ============================================================================
+# TRAFFIC RECORDING - CAPTURE REQUEST MIXES FOR replay.py
+# ============================================================================
+
+@app.before_request
+def stamp_arrival():
+    # Registered before inject_faults so injected latency is not recorded as think time
+    if traffic_recorder.active and not request.path.startswith('/api/admin/'):
+        g.arrival = time.time()
+
+def record_request(response):
+    arrival = g.pop('arrival', None)
+    if arrival is None:
+        return response
+    issued = None
+    if request.endpoint == 'login' and response.status_code == 200:
+        issued = (response.get_json(silent=True) or {}).get('token')
+    token = request.headers.get('Authorization', '').replace('Bearer ', '')
+    traffic_recorder.record(
+        arrival,
+        request.method,
+        request.full_path if request.query_string else request.path,
+        request.get_data(cache=True),
+        request.content_type,
+        token,
+        response.status_code,
+        issued
+    )
+    return response
+
+@app.route('/api/admin/recording', methods=['GET'])
+def recording_status():
+    return jsonify(traffic_recorder.status()), 200
+
+@app.route('/api/admin/recording', methods=['POST'])
+def start_recording():
+    """
+    Start (or switch) recording to RECORDINGS_DIR/<name>, appending if it exists.
+    Body: {"name": "traffic.ndjson"}
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        traffic_recorder.start(data.get('name', 'traffic.ndjson'))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    except OSError as e:
+        return jsonify({"success": False, "message": f"Cannot open recording: {e}"}), 500
+    return jsonify({"success": True, **traffic_recorder.status()}), 200
+
+@app.route('/api/admin/recording', methods=['DELETE'])
+def stop_recording():
+    traffic_recorder.stop()
+    return jsonify({"success": True, **traffic_recorder.status()}), 200
+
+@app.route('/api/admin/recordings/<name>', methods=['GET'])
+def download_recording(name):
+    try:
+        recording_path(name)
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return send_from_directory(os.path.abspath(RECORDINGS_DIR), name, mimetype='application/x-ndjson')
+
+# ============================================================================
+# FAULT INJECTION - CONTROLLED DEGRADATION
+# ============================================================================
+
+def _aborted_body():
+    """Fallback reset: send headers, then drop the connection mid-response."""
+    yield b""
+    raise ConnectionAbortedError("Injected connection reset")
+
+@app.before_request
+def inject_faults():
+    route = request.url_rule.rule if request.url_rule else request.path
+    decision = fault_engine.decide(route, request.path, request.method)
+    if not decision.any:
+        return None
+    if decision.latency_s:
+        time.sleep(decision.latency_s)
+    if decision.reset:
+        # Socket is dead (or gets cut mid-body), nothing usable reaches the client
+        reset_connection(request.environ)
+        return Response(_aborted_body(), status=200)
+    if decision.error:
+        status, body = decision.error
+        return jsonify(body), status
+    g.fault_drip = decision.drip
+    return None
+
+@app.after_request
+def apply_slow_drip(response):
+    fault_drip = g.pop('fault_drip', None)
+    if fault_drip and not response.is_streamed:
+        chunk_bytes, interval_s = fault_drip
+        response.response = drip(response.get_data(), chunk_bytes, interval_s)
+    return response
+
+# Keep this registration directly after apply_slow_drip: after_request hooks
+# run in reverse order, so the recorder reads the login token before the
+# body is wrapped in a drip generator (get_json() would drain the drip)
+app.after_request(record_request)
+
+@app.route('/api/admin/faults', methods=['GET'])
+def get_faults():
+    return jsonify(fault_engine.snapshot()), 200
+
+@app.route('/api/admin/faults', methods=['PUT', 'POST'])
+def set_faults():
+    """
+    Replace all fault rules and restart the schedule clock.
+    Body: {"seed": 42, "rules": [{"endpoint": "/api/checkout", "kind": "error", ...}]}
+    Without "seed" the FAULT_SEED env var is used, so scripted runs stay
+    reproducible. Pass "seed": null explicitly for unseeded faults.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        fault_engine.configure(data.get('rules', []), data.get('seed', fault_seed))
+    except ValueError as e:
+        return jsonify({"success": False, "message": str(e)}), 400
+    return jsonify({"success": True, **fault_engine.snapshot()}), 200
+
+@app.route('/api/admin/faults', methods=['DELETE'])
+def clear_faults():
+    fault_engine.clear()
+    return jsonify({"success": True, "message": "All faults cleared"}), 200
+
 # ============================================================================
 # ALL YOUR OTHER ENDPOINTS (same as before)
 # ============================================================================
@@ -537,11 +682,14 @@ def homepage():
         "endpoints": {
             "dashboard": "/dashboard (WITH RESET BUTTON!)",
             "reset": "/api/admin/reset (POST)",
+            "faults": "/api/admin/faults (GET / PUT / DELETE)",
+            "recording": "/api/admin/recording (GET / POST / DELETE)",
             "health": "/health",
             "products": "/api/products",
             "login": "/api/auth/login (POST)",
             "cart": "/api/cart",
-            "checkout": "/api/checkout (POST)"
+            "checkout": "/api/checkout (POST)",
+            "orders": "/api/orders?username=&since=&until=&cursor=&limit="
         },
         "statistics": {
             "total_products": len(products_db),
@@ -665,22 +813,61 @@ def checkout():
             products_db[item['product_id']]['stock'] -= item['quantity']
             products_db[item['product_id']]['times_purchased'] += 1
     total = sum(item['price'] * item['quantity'] for item in cart)
-    if random.random() < 0.05:
+    payment = fault_engine.decide_point('payment', request.method)
+    if payment.latency_s:
+        time.sleep(payment.latency_s)
+    if payment.error:
         with stock_lock:
             for item in cart:
                 products_db[item['product_id']]['stock'] += item['quantity']
-        return jsonify({"error": "Payment failed"}), 500
+        status, body = payment.error
+        return jsonify(body), status
     order_id = f"ORDER_{username}_{int(time.time())}"
-    orders_db.append({
+    order = {
         "order_id": order_id,
         "username": username,
         "total": round(total, 2),
-        "items_count": len(cart),
-        "timestamp": datetime.now().isoformat()
-    })
+        "items_count": len(cart)
+    }
+    with orders_lock:
+        # Index and list under one lock so both stay in time order
+        order_index.add(order, time.time())
+        orders_db.append(order)
     carts_db[username] = []
     return jsonify({"success": True, "order_id": order_id, "total": round(total, 2)}), 200
 
+def parse_time_param(value):
+    """Accept epoch seconds or an ISO-8601 timestamp (local time, like order timestamps)."""
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+@app.route('/api/orders')
+def list_orders():
+    """Newest-first orders, optionally for one user and/or a time window, with cursor paging."""
+    username = request.args.get('username') or None
+    try:
+        since = parse_time_param(request.args['since']) if request.args.get('since') else None
+        until = parse_time_param(request.args['until']) if request.args.get('until') else None
+    except ValueError:
+        return jsonify({"error": "since/until must be epoch seconds or ISO-8601"}), 400
+    try:
+        cursor = int(request.args['cursor']) if request.args.get('cursor') else None
+        limit = int(request.args.get('limit', 20))
+    except ValueError:
+        return jsonify({"error": "cursor and limit must be integers"}), 400
+    if (cursor is not None and cursor < 0) or not 1 <= limit <= 500:
+        return jsonify({"error": "cursor must be >= 0 and limit between 1 and 500"}), 400
+
+    orders, next_cursor, total = order_index.query(username, since, until, cursor, limit)
+    return jsonify({
+        "orders": orders,
+        "count": len(orders),
+        "total": total,
+        "next_cursor": str(next_cursor) if next_cursor is not None else None
+    }), 200
+
 @app.route('/api/stats')
 def get_stats():
     return jsonify({
@@ -705,6 +892,8 @@ if __name__ == '__main__':
     print(f"📍 Port: {PORT}")
     print(f"📦 Products: {len(products_db)}")
     print(f"🔄 Reset available at: /api/admin/reset (POST)")
+    print(f"💥 Faults configurable at: /api/admin/faults")
+    print(f"⏺  Traffic recording at: /api/admin/recording")
     print("=" * 70)
     app.run(debug=False, host='0.0.0.0', port=PORT)
 
@@ -0,0 +1,202 @@
+# replay.py - DRIVE THE API WITH A RECORDED REQUEST SEQUENCE
+"""
+Time-scaled traffic replay
+==========================
+Replays an NDJSON log written by traffic_recorder.py against a running
+server, keeping the recorded order and inter-arrival gaps:
+
+  python replay.py recordings/traffic.ndjson --host http://localhost:5000 --speed 1
+  python replay.py recordings/traffic.ndjson --speed 10 --concurrency 200
+  python replay.py recordings/traffic.ndjson --speed max
+
+A login and every request that used the token it issued form one
+session. A session's requests are sent one at a time in recorded order,
+so add -> checkout -> checkout gives the same answers every run, even at
+--speed max. Across sessions only the recorded time offsets gate requests.
+
+Tokens are remapped on the fly: when a replayed /api/auth/login answers,
+its fresh token replaces the recorded one in the rest of its session.
+"""
+
+import argparse
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from traffic_recorder import read_log
+
+
+class TokenMap:
+    """Recorded token -> token issued during this replay."""
+
+    def __init__(self):
+        self.tokens = {}
+
+    def issued(self, recorded, fresh):
+        if fresh:
+            self.tokens[recorded] = fresh
+
+    def resolve(self, recorded):
+        return self.tokens.get(recorded, recorded)
+
+
+class Replayer:
+    def __init__(self, entries, host, speed, concurrency, timeout):
+        self.entries = entries
+        self.host = host.rstrip("/")
+        self.speed = speed
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.token_map = TokenMap()
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        # Session key -> entries due but not sent yet, and keys with a drain running
+        self.session_lock = threading.Lock()
+        self.pending = {}
+        self.draining = set()
+        self.latencies = []
+        self.status_counts = {}
+        self.mismatches = 0
+        self.failures = 0
+
+    def session(self):
+        session = getattr(self.local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self.local.session = session
+        return session
+
+    def send(self, entry):
+        headers = {}
+        if entry.get("ct"):
+            headers["Content-Type"] = entry["ct"]
+        if entry.get("tok"):
+            headers["Authorization"] = f"Bearer {self.token_map.resolve(entry['tok'])}"
+
+        started = time.perf_counter()
+        status = None
+        fresh = None
+        try:
+            response = self.session().request(
+                entry["m"], self.host + entry["p"], data=entry["b"] or None,
+                headers=headers, timeout=self.timeout
+            )
+            status = response.status_code
+            if entry.get("iss") and status == 200:
+                fresh = response.json().get("token")
+        except (requests.RequestException, ValueError):
+            pass
+        if entry.get("iss"):
+            self.token_map.issued(entry["iss"], fresh)
+        elapsed = time.perf_counter() - started
+
+        with self.lock:
+            self.latencies.append(elapsed)
+            key = status if status is not None else "failed"
+            self.status_counts[key] = self.status_counts.get(key, 0) + 1
+            if status is None:
+                self.failures += 1
+            elif status != entry.get("s"):
+                self.mismatches += 1
+
+    def dispatch(self, pool, entry):
+        """Hand an entry that is due to the pool, behind earlier ones in its session."""
+        key = entry.get("iss") or entry.get("tok")
+        if key is None:
+            pool.submit(self.send, entry)
+            return
+        with self.session_lock:
+            self.pending.setdefault(key, deque()).append(entry)
+            if key in self.draining:
+                return
+            self.draining.add(key)
+        pool.submit(self.drain, key)
+
+    def drain(self, key):
+        """Send one session's due entries in order until none are left."""
+        while True:
+            with self.session_lock:
+                pending = self.pending[key]
+                if not pending:
+                    del self.pending[key]
+                    self.draining.discard(key)
+                    return
+                entry = pending.popleft()
+            self.send(entry)
+
+    def run(self):
+        if not self.entries:
+            return 0.0
+        first = self.entries[0]["t"]
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for entry in self.entries:
+                if self.speed:
+                    delay = (entry["t"] - first) / self.speed - (time.perf_counter() - started)
+                    if delay > 0:
+                        time.sleep(delay)
+                self.dispatch(pool, entry)
+        return time.perf_counter() - started
+
+    def summary(self, wall):
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            if not latencies:
+                return 0.0
+            return latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))] * 1000
+
+        recorded_span = self.entries[-1]["t"] - self.entries[0]["t"] if self.entries else 0.0
+        return {
+            "requests": len(latencies),
+            "wall_s": round(wall, 3),
+            "recorded_span_s": round(recorded_span, 3),
+            "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+            "latency_ms": {"p50": round(pct(50), 1), "p95": round(pct(95), 1), "p99": round(pct(99), 1)},
+            "status": {str(k): v for k, v in sorted(self.status_counts.items(), key=lambda kv: str(kv[0]))},
+            "status_mismatches": self.mismatches,
+            "connection_failures": self.failures
+        }
+
+
+def parse_speed(value):
+    if value in ("max", "0"):
+        return 0.0
+    speed = float(value)
+    if speed <= 0:
+        raise argparse.ArgumentTypeError("speed must be > 0 or 'max'")
+    return speed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay recorded API traffic")
+    parser.add_argument("log", help="NDJSON log written by the traffic recorder")
+    parser.add_argument("--host", default="http://localhost:5000")
+    parser.add_argument("--speed", type=parse_speed, default=1.0,
+                        help="time scale: 1 = real time, 10 = ten times faster, max = no waiting")
+    parser.add_argument("--concurrency", type=int, default=50, help="max requests in flight")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    args = parser.parse_args(argv)
+
+    entries = read_log(args.log)
+    speed_label = f"{args.speed:g}x" if args.speed else "max"
+    print(f"▶ Replaying {len(entries)} requests against {args.host} at {speed_label} "
+          f"with up to {args.concurrency} in flight")
+
+    replayer = Replayer(entries, args.host, args.speed, args.concurrency, args.timeout)
+    wall = replayer.run()
+    result = replayer.summary(wall)
+
+    print("=" * 70)
+    for key, value in result.items():
+        print(f"{key:>22}: {value}")
+    print("=" * 70)
+    return 1 if result["connection_failures"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
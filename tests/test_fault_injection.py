@@ -0,0 +1,87 @@
+import pytest
+
+from fault_injection import DEFAULT_RULES, FaultEngine, validate_rule
+
+
+def test_validate_rule_fills_defaults():
+    rule = validate_rule({"endpoint": "/api/search", "kind": "slow_drip"})
+    assert rule["rate"] == 1.0
+    assert rule["start_after_s"] == 0.0
+    assert rule["duration_s"] is None
+    assert rule["drip_bytes"] == 64
+    assert rule["drip_interval_ms"] == 200
+
+
+def test_validate_rule_treats_null_as_default():
+    rule = validate_rule({
+        "endpoint": "*", "kind": "slow_drip", "rate": None,
+        "start_after_s": None, "drip_bytes": None, "drip_interval_ms": None
+    })
+    assert rule["rate"] == 1.0
+    assert rule["start_after_s"] == 0.0
+    assert rule["drip_bytes"] == 64
+    assert rule["drip_interval_ms"] == 200
+
+    engine = FaultEngine([rule], seed=1)
+    assert engine.decide("/api/search", "/api/search", "GET").drip == (64, 0.2)
+    assert engine.snapshot()["rules"][0]["current_rate"] == 1.0
+
+
+@pytest.mark.parametrize("rule", [
+    {"kind": "error"},
+    {"endpoint": "checkout", "kind": "error"},
+    {"endpoint": "/x", "kind": "explode"},
+    {"endpoint": "/x", "kind": "error", "rate": 1.5},
+    {"endpoint": "/x", "kind": "error", "rate": "0.5"},
+    {"endpoint": "/x", "kind": "error", "status": 200},
+    {"endpoint": "/x", "kind": "error", "rate_to": 0.3},
+    {"endpoint": "/x", "kind": "latency"},
+    {"endpoint": "/x", "kind": "latency", "latency_ms": [200, 100]},
+    {"endpoint": "/x", "kind": "slow_drip", "drip_bytes": 0},
+    {"endpoint": "payment", "kind": "reset"},
+    {"endpoint": "payment", "kind": "slow_drip"},
+])
+def test_validate_rule_rejects_bad_rules(rule):
+    with pytest.raises(ValueError):
+        validate_rule(rule)
+
+
+def test_current_rate_follows_schedule():
+    engine = FaultEngine()
+    rule = validate_rule({
+        "endpoint": "/api/checkout", "kind": "error", "rate": 0.0,
+        "rate_to": 0.3, "ramp_s": 300, "start_after_s": 10, "duration_s": 400
+    })
+    assert engine.current_rate(rule, 5) is None
+    assert engine.current_rate(rule, 10) == 0.0
+    assert engine.current_rate(rule, 160) == pytest.approx(0.15)
+    assert engine.current_rate(rule, 310) == pytest.approx(0.3)
+    assert engine.current_rate(rule, 409) == pytest.approx(0.3)
+    assert engine.current_rate(rule, 410) is None
+
+
+def test_same_seed_same_faults():
+    rules = [{"endpoint": "*", "kind": "error", "rate": 0.5}]
+    runs = []
+    for _ in range(2):
+        engine = FaultEngine(rules, seed=42)
+        runs.append([bool(engine.decide("/api/products", "/api/products", "GET").error)
+                     for _ in range(50)])
+    assert runs[0] == runs[1]
+    assert 0 < sum(runs[0]) < 50
+
+
+def test_admin_routes_and_fault_points_are_separate():
+    engine = FaultEngine([{"endpoint": "*", "kind": "error", "rate": 1}])
+    assert not engine.decide("/api/admin/faults", "/api/admin/faults", "PUT").any
+    assert not engine.decide_point("payment", "POST").any
+    assert engine.decide("/api/checkout", "/api/checkout", "POST").error
+
+
+def test_default_rule_only_hits_payment_point():
+    engine = FaultEngine(DEFAULT_RULES, seed=7)
+    assert not any(engine.decide("/api/checkout", "/api/checkout", "POST").any
+                   for _ in range(200))
+    failures = [engine.decide_point("payment", "POST").error for _ in range(2000)]
+    assert 40 < sum(1 for f in failures if f) < 160
+    assert next(f for f in failures if f) == (500, {"error": "Payment failed"})
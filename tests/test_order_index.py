@@ -0,0 +1,61 @@
+from datetime import datetime
+
+from order_index import OrderIndex
+
+
+def build_index(count=10):
+    index = OrderIndex()
+    for i in range(count):
+        index.add({"order_id": f"ORDER_{i}", "username": "ab"[i % 2]}, 100 + i)
+    return index
+
+
+def ids(orders):
+    return [order["order_id"] for order in orders]
+
+
+def test_add_stamps_timestamp_and_never_goes_backwards():
+    index = build_index(2)
+    order = {"order_id": "ORDER_late", "username": "a"}
+    assert index.add(order, 50) == 101
+    assert order["timestamp"] == datetime.fromtimestamp(101).isoformat()
+
+
+def test_cursor_pages_newest_first_until_exhausted():
+    index = build_index()
+    seen = []
+    cursor = None
+    while True:
+        orders, cursor, total = index.query(cursor=cursor, limit=4)
+        assert total == 10
+        seen.extend(ids(orders))
+        if cursor is None:
+            break
+    assert seen == [f"ORDER_{i}" for i in range(9, -1, -1)]
+
+
+def test_cursor_stays_valid_while_orders_are_appended():
+    index = build_index()
+    first, cursor, _ = index.query(limit=3)
+    index.add({"order_id": "ORDER_new", "username": "a"}, 200)
+    second, _, _ = index.query(cursor=cursor, limit=3)
+    assert ids(first) == ["ORDER_9", "ORDER_8", "ORDER_7"]
+    assert ids(second) == ["ORDER_6", "ORDER_5", "ORDER_4"]
+
+
+def test_user_and_time_window():
+    index = build_index()
+    orders, cursor, total = index.query("a", since=102, until=106, limit=2)
+    assert total == 3
+    assert ids(orders) == ["ORDER_6", "ORDER_4"]
+    orders, cursor, _ = index.query("a", since=102, until=106, cursor=cursor, limit=2)
+    assert ids(orders) == ["ORDER_2"]
+    assert cursor is None
+
+
+def test_unknown_user_empty_window_and_clear():
+    index = build_index()
+    assert index.query("nobody") == ([], None, 0)
+    assert index.query(since=500) == ([], None, 0)
+    index.clear()
+    assert index.query() == ([], None, 0)
@@ -0,0 +1,93 @@
+import pytest
+
+import render_server
+import traffic_recorder
+
+
+@pytest.fixture
+def client():
+    render_server.app.config["TESTING"] = True
+    with render_server.app.test_client() as client:
+        yield client
+    render_server.fault_engine.configure(render_server.DEFAULT_RULES, render_server.fault_seed)
+
+
+def test_put_faults_without_seed_uses_env_seed(client, monkeypatch):
+    monkeypatch.setattr(render_server, "fault_seed", 1234)
+    rules = [{"endpoint": "/api/products", "kind": "error", "rate": 0.5}]
+
+    assert client.put("/api/admin/faults", json={"rules": rules}).get_json()["seed"] == 1234
+    assert client.put("/api/admin/faults", json={"rules": rules, "seed": 7}).get_json()["seed"] == 7
+    assert client.put("/api/admin/faults", json={"rules": rules, "seed": None}).get_json()["seed"] is None
+
+
+def test_put_faults_rejects_unsupported_fault_point_kind(client):
+    response = client.put("/api/admin/faults", json={"rules": [{"endpoint": "payment", "kind": "reset"}]})
+    assert response.status_code == 400
+
+
+def test_recording_start_failure_is_reported_and_leaves_recorder_stopped(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_recorder, "RECORDINGS_DIR", str(tmp_path))
+    (tmp_path / "adir").mkdir()
+
+    response = client.post("/api/admin/recording", json={"name": "adir"})
+    assert response.status_code == 500
+    assert response.get_json()["success"] is False
+    assert client.get("/api/admin/recording").get_json()["recording"] is False
+    assert client.delete("/api/admin/recording").status_code == 200
+
+
+@pytest.fixture
+def shop(client, monkeypatch):
+    # No think time, no payment failures, and a clock that ticks one second per call
+    ticks = iter(range(1_000_000, 2_000_000))
+    monkeypatch.setattr(render_server.time, "sleep", lambda seconds: None)
+    monkeypatch.setattr(render_server.time, "time", lambda: float(next(ticks)))
+    render_server.fault_engine.configure([], 0)
+    client.post("/api/admin/reset")
+    yield client
+    client.post("/api/admin/reset")
+
+
+def checkout_as(client, username, count, product_id):
+    token = client.post("/api/auth/login", json={"username": username}).get_json()["token"]
+    auth = {"Authorization": f"Bearer {token}"}
+    for _ in range(count):
+        client.post("/api/cart/add", json={"product_id": product_id, "quantity": 1}, headers=auth)
+        assert client.post("/api/checkout", headers=auth).status_code == 200
+
+
+def test_orders_by_user_time_window_and_cursor(shop):
+    checkout_as(shop, "alice", 3, product_id=1)
+    checkout_as(shop, "bob", 2, product_id=2)
+
+    everyone = shop.get("/api/orders").get_json()
+    assert everyone["total"] == 5
+    assert [o["username"] for o in everyone["orders"]] == ["bob", "bob", "alice", "alice", "alice"]
+
+    alice = shop.get("/api/orders?username=alice&limit=2").get_json()
+    assert alice["total"] == 3
+    assert [o["username"] for o in alice["orders"]] == ["alice", "alice"]
+    rest = shop.get(f"/api/orders?username=alice&limit=2&cursor={alice['next_cursor']}").get_json()
+    assert len(rest["orders"]) == 1 and rest["next_cursor"] is None
+    assert alice["orders"] + rest["orders"] == [o for o in everyone["orders"] if o["username"] == "alice"]
+
+    # ISO-8601 since, epoch-seconds until: the middle three orders
+    oldest_first = everyone["orders"][::-1]
+    since = oldest_first[1]["timestamp"]
+    until = render_server.datetime.fromisoformat(oldest_first[3]["timestamp"]).timestamp()
+    window = shop.get(f"/api/orders?since={since}&until={until}").get_json()
+    assert window["orders"] == oldest_first[1:4][::-1]
+
+    shop.post("/api/admin/reset")
+    assert shop.get("/api/orders").get_json() == {"orders": [], "count": 0, "total": 0, "next_cursor": None}
+    assert shop.get("/api/orders?username=alice").get_json()["total"] == 0
+
+
+@pytest.mark.parametrize("query", [
+    "since=yesterday", "until=2026-13-45", "cursor=abc", "cursor=-1", "limit=0", "limit=501", "limit=x"
+])
+def test_orders_rejects_bad_params(client, query):
+    response = client.get(f"/api/orders?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
@@ -0,0 +1,55 @@
+import threading
+
+import pytest
+from werkzeug.serving import make_server
+
+import render_server
+import traffic_recorder
+from replay import Replayer
+from traffic_recorder import read_log
+
+USERS = ["alice", "bob", "carol", "dave", "erin", "frank"]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    # Handler think time and random payment failures would only slow and blur the test
+    monkeypatch.setattr(render_server.time, "sleep", lambda seconds: None)
+    render_server.fault_engine.configure([], 0)
+    httpd = make_server("127.0.0.1", 0, render_server.app, threaded=True)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_port}"
+    httpd.shutdown()
+    render_server.fault_engine.configure(render_server.DEFAULT_RULES, render_server.fault_seed)
+
+
+def record_sessions(tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_recorder, "RECORDINGS_DIR", str(tmp_path))
+    client = render_server.app.test_client()
+    client.post("/api/admin/reset")
+    render_server.traffic_recorder.start("sessions.ndjson")
+    try:
+        for product_id, username in enumerate(USERS, start=1):
+            token = client.post("/api/auth/login", json={"username": username}).get_json()["token"]
+            auth = {"Authorization": f"Bearer {token}"}
+            client.post("/api/cart/add", json={"product_id": product_id, "quantity": 1}, headers=auth)
+            client.post("/api/checkout", headers=auth)
+            client.post("/api/checkout", headers=auth)
+    finally:
+        render_server.traffic_recorder.stop()
+    return read_log(tmp_path / "sessions.ndjson")
+
+
+def test_dependent_sessions_replay_identically_at_max_speed(server, tmp_path, monkeypatch):
+    entries = record_sessions(tmp_path, monkeypatch)
+    assert len(entries) == 4 * len(USERS)
+    assert [e["s"] for e in entries[:4]] == [200, 201, 200, 400]
+
+    for _ in range(3):
+        render_server.app.test_client().post("/api/admin/reset")
+        replayer = Replayer(entries, server, speed=0.0, concurrency=32, timeout=10)
+        result = replayer.summary(replayer.run())
+        assert result["connection_failures"] == 0
+        assert result["status_mismatches"] == 0
+        assert result["status"] == {"200": 12, "201": 6, "400": 6}
@@ -0,0 +1,76 @@
+import json
+import threading
+
+import pytest
+
+import traffic_recorder
+from traffic_recorder import TrafficRecorder, encode_entry, read_log, recording_path
+
+
+def test_encode_entry_round_trips_through_read_log(tmp_path):
+    log = tmp_path / "traffic.ndjson"
+    lines = [
+        encode_entry(20.5, "GET", "/api/cart", b"", None, "tok_a", 200, None),
+        encode_entry(10.25, "POST", "/api/auth/login", b'{"username": "a"}',
+                     "application/json", "", 200, "tok_a"),
+        encode_entry(30.0, "POST", "/upload", b"\xff\x00", "application/octet-stream", "", 404, None),
+    ]
+    log.write_text("\n".join(lines) + "\n\n", encoding="utf-8")
+
+    assert json.loads(lines[0]) == {"t": 20.5, "m": "GET", "p": "/api/cart", "tok": "tok_a", "s": 200}
+
+    login, cart, upload = read_log(log)
+    assert login["p"] == "/api/auth/login"
+    assert login["b"] == b'{"username": "a"}'
+    assert login["ct"] == "application/json"
+    assert login["iss"] == "tok_a"
+    assert cart["b"] == b""
+    assert cart["tok"] == "tok_a"
+    assert upload["b"] == b"\xff\x00"
+    assert "b64" not in upload
+
+
+@pytest.mark.parametrize("name", ["", "../x.ndjson", "dir/x.ndjson", ".hidden"])
+def test_recording_path_rejects_unsafe_names(name):
+    with pytest.raises(ValueError):
+        recording_path(name)
+
+
+def test_failed_start_leaves_recorder_untouched(tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_recorder, "RECORDINGS_DIR", str(tmp_path))
+    (tmp_path / "adir").mkdir()
+    recorder = TrafficRecorder()
+    recorder.start("first.ndjson")
+
+    with pytest.raises(OSError):
+        recorder.start("adir")
+    assert recorder.status()["path"] == str(tmp_path / "first.ndjson")
+    recorder.stop()
+
+    with pytest.raises(OSError):
+        recorder.start("adir")
+    assert not recorder.active
+    recorder.record(1.0, "GET", "/health", b"", None, "", 200, None)
+    recorder.stop()
+
+
+def test_recorder_keeps_every_entry_up_to_stop(tmp_path, monkeypatch):
+    monkeypatch.setattr(traffic_recorder, "RECORDINGS_DIR", str(tmp_path))
+    recorder = TrafficRecorder()
+    recorder.start("traffic.ndjson")
+
+    def hammer(worker):
+        for i in range(500):
+            recorder.record(worker * 1000 + i, "GET", "/health", b"", None, "", 200, None)
+
+    threads = [threading.Thread(target=hammer, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    recorder.stop()
+    recorder.record(99999, "GET", "/health", b"", None, "", 200, None)
+
+    entries = read_log(tmp_path / "traffic.ndjson")
+    assert len(entries) == recorder.status()["recorded"] == 2000
+    assert not recorder.active
@@ -0,0 +1,161 @@
+# traffic_recorder.py - CAPTURE REAL REQUEST MIXES FOR REPLAY
+"""
+Traffic recorder
+================
+Appends one compact JSON line per request to an NDJSON log:
+
+  {"t": 1760781234.512301, "m": "POST", "p": "/api/cart/add",
+   "b": "{\"product_id\": 7}", "ct": "application/json",
+   "tok": "token_alice_...", "s": 201}
+
+- t   -> arrival time (epoch seconds), replay uses the gaps between them
+- m/p -> method and path including query string
+- b   -> request body as text ("b64" set when it was not UTF-8)
+- ct  -> request Content-Type, only when there is a body
+- tok -> bearer token the client sent, if any
+- iss -> token handed out by /api/auth/login, so replay can remap it
+- s   -> status code the server answered with
+
+Request threads only put a tuple on a queue. A background thread does
+the JSON encoding and file writes, so recording adds very little
+per-request latency. replay.py reads these logs back.
+"""
+
+import base64
+import json
+import os
+import queue
+import threading
+from datetime import datetime
+
+RECORDINGS_DIR = os.environ.get("RECORDINGS_DIR", "recordings")
+
+_STOP = object()
+
+
+def encode_entry(arrival, method, path, body, content_type, token, status, issued):
+    entry = {"t": round(arrival, 6), "m": method, "p": path}
+    if body:
+        try:
+            entry["b"] = body.decode("utf-8")
+        except UnicodeDecodeError:
+            entry["b"] = base64.b64encode(body).decode("ascii")
+            entry["b64"] = True
+        if content_type:
+            entry["ct"] = content_type
+    if token:
+        entry["tok"] = token
+    if issued:
+        entry["iss"] = issued
+    entry["s"] = status
+    return json.dumps(entry, separators=(",", ":"))
+
+
+def read_log(path):
+    """Load a recorded log, sorted by arrival time. Bodies come back as bytes."""
+    entries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            entry = json.loads(line)
+            body = entry.get("b")
+            if body is None:
+                entry["b"] = b""
+            elif entry.pop("b64", False):
+                entry["b"] = base64.b64decode(body)
+            else:
+                entry["b"] = body.encode("utf-8")
+            entries.append(entry)
+    entries.sort(key=lambda e: e["t"])
+    return entries
+
+
+def recording_path(name):
+    """Resolve a recording name inside RECORDINGS_DIR. Raises ValueError."""
+    if not name or os.path.basename(name) != name or name.startswith("."):
+        raise ValueError("'name' must be a plain file name like traffic.ndjson")
+    return os.path.join(RECORDINGS_DIR, name)
+
+
+class TrafficRecorder:
+    """Append-only NDJSON writer fed from request threads through a queue."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.queue = None
+        self.thread = None
+        self.path = None
+        self.started_at = None
+        self.recorded = 0
+
+    @property
+    def active(self):
+        return self.queue is not None
+
+    def start(self, name):
+        """
+        Start appending to RECORDINGS_DIR/name, stopping any current recording.
+        Raises ValueError for a bad name and OSError if the log can't be opened.
+        """
+        path = recording_path(name)
+        os.makedirs(RECORDINGS_DIR, exist_ok=True)
+        # Open first: if this raises, nothing (including a running recording) changes
+        log = open(path, "a", encoding="utf-8")
+        self.stop()
+        with self.lock:
+            self.queue = queue.SimpleQueue()
+            self.path = path
+            self.started_at = datetime.now().isoformat()
+            self.recorded = 0
+            self.thread = threading.Thread(
+                target=self._write_loop, args=(self.queue, log),
+                name="traffic-recorder", daemon=True
+            )
+            self.thread.start()
+
+    def stop(self):
+        """Flush everything queued so far and close the log."""
+        with self.lock:
+            if self.queue is None:
+                return
+            self.queue.put(_STOP)
+            thread = self.thread
+            self.queue = None
+            self.thread = None
+        thread.join()
+
+    def record(self, *fields):
+        """Queue one request, see encode_entry for the field order."""
+        # Under the lock so nothing lands behind stop()'s _STOP and gets lost
+        with self.lock:
+            if self.queue is not None:
+                self.queue.put(fields)
+                self.recorded += 1
+
+    def status(self):
+        return {
+            "recording": self.active,
+            "path": self.path,
+            "started_at": self.started_at,
+            "recorded": self.recorded
+        }
+
+    @staticmethod
+    def _write_loop(q, f):
+        with f:
+            while True:
+                item = q.get()
+                lines = []
+                while item is not _STOP:
+                    lines.append(encode_entry(*item))
+                    try:
+                        item = q.get_nowait()
+                    except queue.Empty:
+                        break
+                if lines:
+                    f.write("\n".join(lines) + "\n")
+                    f.flush()
+                if item is _STOP:
+                    return